@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Shared memory-mapped view of server.js across skill scripts.
+
+Memoizes a read-only mmap keyed on mtime so scripts invoked together in one
+process (e.g. driven by a build skill) map the file once, and regex scans run
+against the OS page cache instead of a fully decoded copy. Callers must use
+bytes patterns and decode only the groups they capture.
+"""
+
+import mmap
+from pathlib import Path
+
+# path -> (st_mtime_ns, mapping)
+_CACHE: dict[Path, tuple[int, mmap.mmap]] = {}
+
+
+def map_cached(path: Path) -> mmap.mmap:
+    """Memory-map a file read-only, reusing the mapping while mtime is unchanged."""
+    key = path.stat().st_mtime_ns
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _CACHE[path] = (key, mapping)
+    return mapping
@@ -7,31 +7,42 @@ Usage: python3 generate-docs.py [--output FILE] [--format FORMAT]
 """
 
 import argparse
+import functools
 import json
+import os
 import re
 import sys
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_common"))
+from _server_cache import map_cached  # noqa: E402
+
 
 def get_project_root() -> Path:
     """Get the project root directory."""
     return Path(__file__).parent.parent.parent.parent.parent
 
 
-def extract_tools(server_content: str) -> list[dict]:
+# Pattern to match tool registrations, compiled once at import time. Bytes
+# mode so it can scan the mmap'd file without decoding the whole buffer.
+# Look for server.registerTool("name", { description, inputSchema }, handler)
+_REGISTER_RE = re.compile(
+    rb'server\.registerTool\(\s*["\'](\w+)["\']\s*,\s*\{\s*description:\s*["\']([^"\']+)["\']',
+    re.DOTALL,
+)
+
+
+def extract_tools(server_content: bytes) -> list[dict]:
     """Extract tool definitions from server.js."""
     tools = []
 
-    # Pattern to match tool registrations
-    # Look for server.registerTool("name", { description, inputSchema }, handler)
-    pattern = r'server\.registerTool\(\s*["\'](\w+)["\']\s*,\s*\{\s*description:\s*["\']([^"\']+)["\']'
-
-    matches = re.finditer(pattern, server_content, re.DOTALL)
+    matches = _REGISTER_RE.finditer(server_content)
 
     for match in matches:
-        tool_name = match.group(1)
-        description = match.group(2)
+        # Interned so repeated membership tests compare by pointer
+        tool_name = sys.intern(match.group(1).decode("ascii"))
+        description = match.group(2).decode("utf-8")
 
         tools.append({
             "name": tool_name,
@@ -41,177 +52,194 @@ def extract_tools(server_content: str) -> list[dict]:
     return tools
 
 
-def categorize_tools(tools: list[dict]) -> dict[str, list[dict]]:
-    """Categorize tools by their type."""
-    categories = {
-        "Basic Tools": ["fetch_url", "extract_text", "extract_links", "extract_metadata", "scrape_structured"],
-        "Search & Crawl": ["search_web", "crawl_deep", "map_site"],
-        "Content Processing": ["extract_content", "process_document", "summarize_content", "analyze_content"],
-        "Advanced (Wave 2)": ["batch_scrape", "scrape_with_actions"],
-        "Research & Tracking (Wave 3)": ["deep_research", "track_changes", "generate_llms_txt", "stealth_mode", "localization"],
-    }
-
-    categorized = {cat: [] for cat in categories}
-    uncategorized = []
+_CATEGORIES = {
+    "Basic Tools": ["fetch_url", "extract_text", "extract_links", "extract_metadata", "scrape_structured"],
+    "Search & Crawl": ["search_web", "crawl_deep", "map_site"],
+    "Content Processing": ["extract_content", "process_document", "summarize_content", "analyze_content"],
+    "Advanced (Wave 2)": ["batch_scrape", "scrape_with_actions"],
+    "Research & Tracking (Wave 3)": ["deep_research", "track_changes", "generate_llms_txt", "stealth_mode", "localization"],
+}
 
-    tool_map = {t["name"]: t for t in tools}
+# Reverse index built once at import so categorization is a single O(N) pass.
+_TOOL_TO_CATEGORY = {name: cat for cat, names in _CATEGORIES.items() for name in names}
 
-    for category, tool_names in categories.items():
-        for name in tool_names:
-            if name in tool_map:
-                categorized[category].append(tool_map[name])
 
-    # Find uncategorized
-    all_categorized = set()
-    for names in categories.values():
-        all_categorized.update(names)
+@functools.lru_cache(maxsize=4)
+def _categorize_names(names: tuple[str, ...]) -> dict[str, tuple[str, ...]]:
+    """Bucket tool names by category; cached so markdown and JSON share one pass."""
+    buckets = {cat: [] for cat in _CATEGORIES}
+    uncategorized = []
 
-    for tool in tools:
-        if tool["name"] not in all_categorized:
-            uncategorized.append(tool)
+    for name in names:
+        category = _TOOL_TO_CATEGORY.get(name)
+        if category:
+            buckets[category].append(name)
+        else:
+            uncategorized.append(name)
 
     if uncategorized:
-        categorized["Other"] = uncategorized
+        buckets["Other"] = uncategorized
 
-    return categorized
+    return {cat: tuple(bucket) for cat, bucket in buckets.items()}
 
 
-def generate_markdown(tools: list[dict], version: str) -> str:
-    """Generate markdown documentation."""
+def categorize_tools(tools: list[dict]) -> dict[str, list[dict]]:
+    """Categorize tools by their type."""
+    tool_map = {t["name"]: t for t in tools}
+    buckets = _categorize_names(tuple(t["name"] for t in tools))
+    return {cat: [tool_map[n] for n in names] for cat, names in buckets.items()}
+
+
+# Constant pieces of the per-tool usage block, built once instead of per tool.
+_USAGE_HEAD = ("**Usage:**", "```json", "{")
+_USAGE_TAIL = ('  "arguments": {', '    // Tool-specific parameters', '  }', "}", "```", "")
+
+_CREDIT_COSTS = (
+    "## Credit Costs",
+    "",
+    "| Tool | Credits |",
+    "|------|---------|",
+    "| fetch_url | 1 |",
+    "| extract_text | 1 |",
+    "| extract_links | 1 |",
+    "| extract_metadata | 1 |",
+    "| scrape_structured | 2 |",
+    "| search_web | 5 |",
+    "| crawl_deep | 5 |",
+    "| map_site | 5 |",
+    "| extract_content | 2 |",
+    "| process_document | 2 |",
+    "| summarize_content | 2 |",
+    "| analyze_content | 2 |",
+    "| batch_scrape | 5 |",
+    "| scrape_with_actions | 5 |",
+    "| deep_research | 10 |",
+    "| track_changes | 3 |",
+    "| generate_llms_txt | 3 |",
+    "| stealth_mode | 5 |",
+    "| localization | 5 |",
+    "",
+)
+
+
+def _emit_markdown(tools: list[dict], version: str, generated: datetime):
+    """Yield markdown lines for the tool reference."""
     categorized = categorize_tools(tools)
 
-    lines = [
-        "# CrawlForge MCP Server - Tool Reference",
-        "",
-        f"**Version:** {version}",
-        f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        f"**Total Tools:** {len(tools)}",
-        "",
-        "---",
-        "",
-        "## Table of Contents",
-        "",
-    ]
+    yield "# CrawlForge MCP Server - Tool Reference"
+    yield ""
+    yield f"**Version:** {version}"
+    yield f"**Generated:** {generated.strftime('%Y-%m-%d %H:%M:%S')}"
+    yield f"**Total Tools:** {len(tools)}"
+    yield ""
+    yield "---"
+    yield ""
+    yield "## Table of Contents"
+    yield ""
 
     # TOC
     for category in categorized:
         if categorized[category]:
             anchor = category.lower().replace(" ", "-").replace("(", "").replace(")", "")
-            lines.append(f"- [{category}](#{anchor})")
+            yield f"- [{category}](#{anchor})"
 
-    lines.extend(["", "---", ""])
+    yield ""
+    yield "---"
+    yield ""
 
     # Tool sections
     for category, cat_tools in categorized.items():
         if not cat_tools:
             continue
 
-        lines.append(f"## {category}")
-        lines.append("")
+        yield f"## {category}"
+        yield ""
 
         for tool in cat_tools:
-            lines.append(f"### `{tool['name']}`")
-            lines.append("")
-            lines.append(tool["description"])
-            lines.append("")
-            lines.append("**Usage:**")
-            lines.append("```json")
-            lines.append("{")
-            lines.append(f'  "name": "{tool["name"]}",')
-            lines.append('  "arguments": {')
-            lines.append('    // Tool-specific parameters')
-            lines.append('  }')
-            lines.append("}")
-            lines.append("```")
-            lines.append("")
-
-        lines.append("---")
-        lines.append("")
+            yield f"### `{tool['name']}`"
+            yield ""
+            yield tool["description"]
+            yield ""
+            yield from _USAGE_HEAD
+            yield f'  "name": "{tool["name"]}",'
+            yield from _USAGE_TAIL
+
+        yield "---"
+        yield ""
 
     # Credit costs
-    lines.extend([
-        "## Credit Costs",
-        "",
-        "| Tool | Credits |",
-        "|------|---------|",
-        "| fetch_url | 1 |",
-        "| extract_text | 1 |",
-        "| extract_links | 1 |",
-        "| extract_metadata | 1 |",
-        "| scrape_structured | 2 |",
-        "| search_web | 5 |",
-        "| crawl_deep | 5 |",
-        "| map_site | 5 |",
-        "| extract_content | 2 |",
-        "| process_document | 2 |",
-        "| summarize_content | 2 |",
-        "| analyze_content | 2 |",
-        "| batch_scrape | 5 |",
-        "| scrape_with_actions | 5 |",
-        "| deep_research | 10 |",
-        "| track_changes | 3 |",
-        "| generate_llms_txt | 3 |",
-        "| stealth_mode | 5 |",
-        "| localization | 5 |",
-        "",
-    ])
-
-    return "\n".join(lines)
-
-
-def generate_json(tools: list[dict], version: str) -> str:
-    """Generate JSON documentation."""
-    return json.dumps({
+    yield from _CREDIT_COSTS
+
+
+def generate_markdown(tools: list[dict], version: str, generated: datetime) -> str:
+    """Generate markdown documentation."""
+    return "\n".join(_emit_markdown(tools, version, generated))
+
+
+def generate_json(tools: list[dict], version: str, generated: datetime, fp,
+                  compact: bool = False) -> None:
+    """Write JSON documentation to an open file object.
+
+    Streaming via json.dump avoids materializing the full string first;
+    compact mode drops the pretty-printing for machine consumers.
+    """
+    json.dump({
         "version": version,
-        "generated": datetime.now().isoformat(),
+        "generated": generated.isoformat(),
         "total_tools": len(tools),
         "tools": tools,
         "categories": categorize_tools(tools),
-    }, indent=2)
+    }, fp, indent=None if compact else 2,
+        separators=(",", ":") if compact else None)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate API documentation")
     parser.add_argument("--output", "-o", help="Output file (default: stdout)")
     parser.add_argument("--format", "-f", choices=["markdown", "json"], default="markdown", help="Output format")
+    parser.add_argument("--compact", action="store_true", help="Compact JSON output (no indentation)")
     args = parser.parse_args()
 
     project_root = get_project_root()
     server_path = project_root / "server.js"
     package_path = project_root / "package.json"
 
-    if not server_path.exists():
-        print("Error: server.js not found", file=sys.stderr)
-        sys.exit(1)
-
     # Get version
     version = "unknown"
-    if package_path.exists():
+    try:
         with open(package_path) as f:
             version = json.load(f).get("version", "unknown")
+    except FileNotFoundError:
+        pass
 
-    # Extract tools
-    with open(server_path) as f:
-        content = f.read()
-
-    tools = extract_tools(content)
+    # Extract tools (open directly — no separate existence probe)
+    try:
+        tools = extract_tools(map_cached(server_path))
+    except FileNotFoundError:
+        print("Error: server.js not found", file=sys.stderr)
+        sys.exit(1)
 
     if not tools:
         print("Warning: No tools found in server.js", file=sys.stderr)
 
-    # Generate output
-    if args.format == "markdown":
-        output = generate_markdown(tools, version)
-    else:
-        output = generate_json(tools, version)
+    # One timestamp for the whole run; SOURCE_DATE_EPOCH makes output
+    # reproducible so downstream caching works
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    generated = datetime.fromtimestamp(int(epoch)) if epoch else datetime.now()
 
-    # Write output
+    # Write output (JSON streams straight to the destination)
     if args.output:
         with open(args.output, 'w') as f:
-            f.write(output)
+            if args.format == "markdown":
+                f.write(generate_markdown(tools, version, generated))
+            else:
+                generate_json(tools, version, generated, f, compact=args.compact)
         print(f"Documentation written to: {args.output}")
+    elif args.format == "markdown":
+        print(generate_markdown(tools, version, generated))
     else:
-        print(output)
+        generate_json(tools, version, generated, sys.stdout, compact=args.compact)
+        sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
@@ -11,8 +11,24 @@ import json
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Optional: the docker SDK tags over the local socket without forking the CLI
+try:
+    import docker as _docker_sdk
+except ImportError:
+    _docker_sdk = None
+
+# Set under --json so stdout stays machine-readable
+_QUIET = False
+
+
+def log(msg: str = "", *args) -> None:
+    """Gated print; %-style args are only formatted when output is enabled."""
+    if not _QUIET:
+        print(msg % args if args else msg)
+
 
 def get_project_root() -> Path:
     """Get the project root directory."""
@@ -26,10 +42,25 @@ def get_version() -> str:
         return json.load(f)["version"]
 
 
-def run_command(cmd: list[str], check: bool = True) -> subprocess.CompletedProcess:
-    """Run a command and return the result."""
-    print(f"  Running: {' '.join(cmd)}")
-    return subprocess.run(cmd, check=check, capture_output=True, text=True)
+def run_command(cmd: list[str], check: bool = True, capture: bool = True) -> subprocess.CompletedProcess:
+    """Run a command and return the result.
+
+    Pass capture=False for commands like docker build whose output can be
+    megabytes — it then streams instead of being buffered. Under --json the
+    stream is redirected to stderr so stdout stays machine-readable.
+    """
+    log("  Running: %s", " ".join(cmd))
+    if capture:
+        return subprocess.run(cmd, check=check, capture_output=True, text=True)
+    if _QUIET:
+        return subprocess.run(cmd, check=check, stdout=sys.stderr, stderr=subprocess.STDOUT)
+    return subprocess.run(cmd, check=check)
+
+
+def dump_results(results: dict) -> None:
+    """Stream the results dict as JSON to stdout without building one big string."""
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
 
 
 def check_docker() -> bool:
@@ -43,8 +74,11 @@ def check_docker() -> bool:
 
 def check_dockerfile() -> bool:
     """Check if Dockerfile exists."""
-    dockerfile = get_project_root() / "Dockerfile"
-    return dockerfile.exists()
+    try:
+        os.stat(get_project_root() / "Dockerfile")
+        return True
+    except FileNotFoundError:
+        return False
 
 
 def build_image(tag: str, no_cache: bool = False) -> bool:
@@ -56,20 +90,20 @@ def build_image(tag: str, no_cache: bool = False) -> bool:
         cmd.insert(2, "--no-cache")
 
     try:
-        result = run_command(cmd)
+        result = run_command(cmd, capture=False)
         return result.returncode == 0
     except subprocess.CalledProcessError as e:
-        print(f"  Build failed: {e.stderr}")
+        log(f"  Build failed (exit {e.returncode})")
         return False
 
 
 def push_image(tag: str) -> bool:
     """Push the Docker image to registry."""
     try:
-        result = run_command(["docker", "push", tag])
+        result = run_command(["docker", "push", tag], capture=False)
         return result.returncode == 0
     except subprocess.CalledProcessError as e:
-        print(f"  Push failed: {e.stderr}")
+        log(f"  Push failed (exit {e.returncode})")
         return False
 
 
@@ -81,6 +115,9 @@ def main():
     parser.add_argument("--json", action="store_true", help="Output results as JSON")
     args = parser.parse_args()
 
+    global _QUIET
+    _QUIET = args.json
+
     results = {
         "status": "pending",
         "checks": {},
@@ -88,87 +125,112 @@ def main():
         "version": None
     }
 
-    print("=== CrawlForge Docker Build ===")
-    print("")
+    log("=== CrawlForge Docker Build ===")
+    log("")
+
+    # Preflight checks are independent — overlap the docker CLI probe with
+    # the Dockerfile stat and the package.json read
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        docker_future = pool.submit(check_docker)
+        dockerfile_future = pool.submit(check_dockerfile)
+        version_future = pool.submit(get_version)
 
     # Check Docker
-    print("Checking Docker...")
-    if not check_docker():
-        print("  Docker not available")
+    log("Checking Docker...")
+    if not docker_future.result():
+        log("  Docker not available")
         results["status"] = "error"
         results["checks"]["docker"] = False
         if args.json:
-            print(json.dumps(results, indent=2))
+            dump_results(results)
         sys.exit(1)
-    print("  Docker available")
+    log("  Docker available")
     results["checks"]["docker"] = True
 
     # Check Dockerfile
-    print("")
-    print("Checking Dockerfile...")
-    if not check_dockerfile():
-        print("  Dockerfile not found")
+    log("")
+    log("Checking Dockerfile...")
+    if not dockerfile_future.result():
+        log("  Dockerfile not found")
         results["status"] = "error"
         results["checks"]["dockerfile"] = False
         if args.json:
-            print(json.dumps(results, indent=2))
+            dump_results(results)
         sys.exit(1)
-    print("  Dockerfile found")
+    log("  Dockerfile found")
     results["checks"]["dockerfile"] = True
 
     # Get version and tag
-    version = get_version()
+    version = version_future.result()
     results["version"] = version
     tag = args.tag or f"crawlforge-mcp-server:{version}"
     results["image"] = tag
 
-    print("")
-    print(f"Building image: {tag}")
-    print(f"Version: {version}")
-    print("")
+    log("")
+    log(f"Building image: {tag}")
+    log(f"Version: {version}")
+    log("")
 
     # Build
-    print("Building Docker image...")
+    log("Building Docker image...")
     if not build_image(tag, args.no_cache):
-        print("  Build failed")
+        log("  Build failed")
         results["status"] = "error"
         results["checks"]["build"] = False
         if args.json:
-            print(json.dumps(results, indent=2))
+            dump_results(results)
         sys.exit(1)
-    print("  Build successful")
+    log("  Build successful")
     results["checks"]["build"] = True
 
-    # Also tag as latest
+    # Also tag as latest, unless that is already the tag being built
     latest_tag = "crawlforge-mcp-server:latest"
-    run_command(["docker", "tag", tag, latest_tag], check=False)
+    tag_process = None
+    if tag != latest_tag:
+        tagged = False
+        if _docker_sdk is not None:
+            try:
+                _docker_sdk.from_env().images.get(tag).tag("crawlforge-mcp-server", "latest")
+                tagged = True
+            except Exception:
+                pass
+        if not tagged:
+            # CLI fallback, in the background so a push doesn't wait on it
+            tag_process = subprocess.Popen(
+                ["docker", "tag", tag, latest_tag],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
 
     # Push if requested
     if args.push:
-        print("")
-        print(f"Pushing image: {tag}")
+        log("")
+        log(f"Pushing image: {tag}")
         if not push_image(tag):
-            print("  Push failed")
+            log("  Push failed")
             results["status"] = "error"
             results["checks"]["push"] = False
             if args.json:
-                print(json.dumps(results, indent=2))
+                dump_results(results)
             sys.exit(1)
-        print("  Push successful")
+        log("  Push successful")
         results["checks"]["push"] = True
 
     results["status"] = "success"
-
-    print("")
-    print("=== Build Complete ===")
-    print(f"  Image: {tag}")
-    print(f"  Also tagged: {latest_tag}")
+    if tag_process is not None:
+        tag_process.wait()
+
+    log("")
+    log("=== Build Complete ===")
+    log(f"  Image: {tag}")
+    if tag != latest_tag:
+        log(f"  Also tagged: {latest_tag}")
     if args.push:
-        print(f"  Pushed to registry")
+        log(f"  Pushed to registry")
 
     if args.json:
-        print("")
-        print(json.dumps(results, indent=2))
+        log("")
+        dump_results(results)
 
     sys.exit(0)
 
@@ -12,34 +12,51 @@ import re
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_common"))
+from _server_cache import map_cached  # noqa: E402
+
 
 def get_project_root() -> Path:
     """Get the project root directory."""
     return Path(__file__).parent.parent.parent.parent.parent
 
 
-def extract_tool_schemas(server_content: str) -> dict:
-    """Extract tool schemas from server.js content."""
-    tools = {}
+# Pattern to match server.registerTool calls, compiled once at import time.
+# Captures name, config body and description in a single pass so no secondary
+# search is needed per tool. Bytes mode so it can scan the mmap'd file
+# without decoding the whole buffer.
+# This is a simplified extraction - real parsing would need AST
+_REGISTER_RE = re.compile(
+    rb'server\.registerTool\(\s*["\'](?P<name>\w+)["\']\s*,\s*'
+    rb'\{(?P<body>[^}]*description:\s*["\'](?P<desc>[^"\']+)["\'][^}]*)\}',
+    re.DOTALL,
+)
 
-    # Pattern to match server.registerTool calls
-    # This is a simplified extraction - real parsing would need AST
-    register_pattern = r'server\.registerTool\(\s*["\'](\w+)["\']\s*,\s*\{([^}]+description[^}]+)\}'
 
-    matches = re.finditer(register_pattern, server_content, re.DOTALL)
+# Expected tools (19 total), built once and interned so the per-run set
+# differences run on pointer-equality fast paths
+_EXPECTED_TOOLS = frozenset(sys.intern(n) for n in (
+    "fetch_url", "extract_text", "extract_links", "extract_metadata",
+    "scrape_structured", "search_web", "crawl_deep", "map_site",
+    "extract_content", "process_document", "summarize_content", "analyze_content",
+    "batch_scrape", "scrape_with_actions", "deep_research",
+    "track_changes", "generate_llms_txt", "stealth_mode", "localization",
+))
 
-    for match in matches:
-        tool_name = match.group(1)
-        tool_config = match.group(2)
 
-        # Extract description
-        desc_match = re.search(r'description:\s*["\']([^"\']+)["\']', tool_config)
-        description = desc_match.group(1) if desc_match else "No description"
+def extract_tool_schemas(server_content: bytes) -> dict:
+    """Extract tool schemas from server.js content."""
+    tools = {}
+
+    for match in _REGISTER_RE.finditer(server_content):
+        # Interned so repeated membership tests compare by pointer
+        tool_name = sys.intern(match.group("name").decode("ascii"))
+        tool_config = match.group("body")
 
         tools[tool_name] = {
             "name": tool_name,
-            "description": description,
-            "has_schema": "inputSchema" in tool_config or "z." in tool_config,
+            "description": match.group("desc").decode("utf-8"),
+            "has_schema": b"inputSchema" in tool_config or b"z." in tool_config,
         }
 
     return tools
@@ -69,17 +86,14 @@ def validate_all_schemas(verbose: bool = False) -> dict:
     project_root = get_project_root()
     server_path = project_root / "server.js"
 
-    if not server_path.exists():
+    try:
+        tools = extract_tool_schemas(map_cached(server_path))
+    except FileNotFoundError:
         return {
             "status": "error",
             "message": "server.js not found"
         }
 
-    with open(server_path, 'r') as f:
-        content = f.read()
-
-    tools = extract_tool_schemas(content)
-
     results = {
         "status": "pending",
         "total_tools": len(tools),
@@ -89,24 +103,14 @@ def validate_all_schemas(verbose: bool = False) -> dict:
         "issues": []
     }
 
-    # Expected tools (19 total)
-    expected_tools = [
-        "fetch_url", "extract_text", "extract_links", "extract_metadata",
-        "scrape_structured", "search_web", "crawl_deep", "map_site",
-        "extract_content", "process_document", "summarize_content", "analyze_content",
-        "batch_scrape", "scrape_with_actions", "deep_research",
-        "track_changes", "generate_llms_txt", "stealth_mode", "localization"
-    ]
-
     # Check for missing tools
     found_tools = set(tools.keys())
-    expected_set = set(expected_tools)
 
-    missing = expected_set - found_tools
+    missing = _EXPECTED_TOOLS - found_tools
     if missing:
         results["issues"].append(f"Missing tools: {', '.join(sorted(missing))}")
 
-    extra = found_tools - expected_set
+    extra = found_tools - _EXPECTED_TOOLS
     if extra and verbose:
         results["issues"].append(f"Extra tools found: {', '.join(sorted(extra))}")
 
@@ -195,7 +199,8 @@ def main():
 
     if args.json:
         print("")
-        print(json.dumps(results, indent=2))
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
 
     sys.exit(0 if results["status"] == "pass" else 1)
 
@@ -3,27 +3,89 @@
 Memory Usage Monitor for CrawlForge MCP Server
 
 Monitors memory usage patterns and detects potential memory leaks.
-Usage: python3 memory-check.py [--duration SECONDS] [--threshold MB]
+Usage: python3 memory-check.py [--duration SECONDS] [--threshold MB] [--interval SECONDS]
 """
 
 import argparse
 import json
+import math
 import os
 import subprocess
 import sys
 import time
 from pathlib import Path
 
+# Set under --json (without --verbose) so stdout stays machine-readable
+_QUIET = False
+
+
+def log(msg: str = "", *args) -> None:
+    """Gated print; %-style args are only formatted when output is enabled."""
+    if not _QUIET:
+        print(msg % args if args else msg)
+
+
+# Optional: numba JITs the regression over long sample arrays (leak hunting
+# with --duration in the hours). Pure-Python accumulators cover the rest.
+try:
+    import numpy as np
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+if HAVE_NUMBA:
+    # Explicit signature so compilation happens at import, not first call
+    @njit("f8(f8[:], f8[:])", cache=True)
+    def _rss_slope(timestamps, rss):
+        n = timestamps.shape[0]
+        mean_t = 0.0
+        mean_r = 0.0
+        for i in range(n):
+            mean_t += timestamps[i]
+            mean_r += rss[i]
+        mean_t /= n
+        mean_r /= n
+        num = 0.0
+        den = 0.0
+        for i in range(n):
+            dt = timestamps[i] - mean_t
+            num += dt * (rss[i] - mean_r)
+            den += dt * dt
+        if den == 0.0:
+            return 0.0
+        return num / den
+
 
 def get_project_root() -> Path:
     """Get the project root directory."""
     return Path(__file__).parent.parent.parent.parent.parent
 
 
+_IS_LINUX = sys.platform.startswith("linux")
+_PAGE_KB = os.sysconf("SC_PAGESIZE") // 1024 if _IS_LINUX else 0
+
+
 def get_node_memory(pid: int) -> dict:
     """Get memory usage of a Node.js process."""
+    if _IS_LINUX:
+        # Read /proc/<pid>/statm directly (page-size units) — no fork per sample
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                parts = f.read().split()
+            vsz_kb = int(parts[0]) * _PAGE_KB
+            rss_kb = int(parts[1]) * _PAGE_KB
+            return {
+                "rss_kb": rss_kb,
+                "vsz_kb": vsz_kb,
+                "rss_mb": round(rss_kb / 1024, 2),
+                "vsz_mb": round(vsz_kb / 1024, 2),
+            }
+        except Exception:
+            return {"rss_kb": 0, "vsz_kb": 0, "rss_mb": 0, "vsz_mb": 0}
+
     try:
-        # Use ps to get memory info
+        # Fall back to ps on non-Linux (macOS has no /proc)
         result = subprocess.run(
             ["ps", "-o", "rss=,vsz=", "-p", str(pid)],
             capture_output=True,
@@ -50,7 +112,9 @@ def start_server() -> subprocess.Popen:
     project_root = get_project_root()
     server_path = project_root / "server.js"
 
-    if not server_path.exists():
+    try:
+        os.stat(server_path)
+    except FileNotFoundError:
         raise FileNotFoundError("server.js not found")
 
     process = subprocess.Popen(
@@ -70,8 +134,14 @@ def start_server() -> subprocess.Popen:
     return process
 
 
-def monitor_memory(duration: int, threshold_mb: int, verbose: bool = False) -> dict:
-    """Monitor memory usage over time."""
+def monitor_memory(duration: int, threshold_mb: int, verbose: bool = False,
+                   keep_samples: bool = True, interval: float = None) -> dict:
+    """Monitor memory usage over time.
+
+    interval sets the seconds between samples; the default picks ~20 samples
+    over the run. Leak hunting wants an explicit fast rate (e.g. 0.1) so long
+    runs accumulate enough samples for the regression slope.
+    """
     results = {
         "status": "pending",
         "duration_seconds": duration,
@@ -81,35 +151,58 @@ def monitor_memory(duration: int, threshold_mb: int, verbose: bool = False) -> d
         "warnings": []
     }
 
-    print(f"Starting server for memory monitoring...")
+    # Running accumulators so statistics come out of the sampling loop itself
+    # instead of re-traversing a sample list afterwards
+    rss_min = math.inf
+    rss_max = -math.inf
+    rss_sum = 0.0
+    rss_count = 0
+    rss_first = rss_last = None
+
+    log(f"Starting server for memory monitoring...")
 
     try:
         server = start_server()
         pid = server.pid
-        print(f"  Server started (PID: {pid})")
-        print("")
+        log(f"  Server started (PID: {pid})")
+        log("")
 
-        start_time = time.time()
-        sample_interval = max(1, duration // 20)  # ~20 samples
+        # Monotonic clock: immune to NTP adjustments, and advancing a fixed
+        # deadline instead of sleeping the raw interval keeps samples evenly
+        # spaced regardless of per-sample overhead.
+        t0 = time.monotonic()
+        sample_interval = interval or max(1, duration // 20)  # default ~20 samples
 
-        print(f"Monitoring for {duration} seconds...")
-        print("")
+        log(f"Monitoring for {duration} seconds...")
+        log("")
 
-        while time.time() - start_time < duration:
+        next_sample = t0
+        while (now := time.monotonic()) - t0 < duration:
             memory = get_node_memory(pid)
 
             if memory["rss_mb"] > 0:
-                sample = {
-                    "timestamp": round(time.time() - start_time, 1),
-                    "rss_mb": memory["rss_mb"],
-                    "vsz_mb": memory["vsz_mb"]
-                }
-                results["samples"].append(sample)
+                rss_mb = memory["rss_mb"]
+                rss_min = min(rss_min, rss_mb)
+                rss_max = max(rss_max, rss_mb)
+                rss_sum += rss_mb
+                rss_count += 1
+                if rss_first is None:
+                    rss_first = rss_mb
+                rss_last = rss_mb
+
+                timestamp = round(now - t0, 1)
+                if keep_samples:
+                    results["samples"].append({
+                        "timestamp": timestamp,
+                        "rss_mb": rss_mb,
+                        "vsz_mb": memory["vsz_mb"]
+                    })
 
                 if verbose:
-                    print(f"  {sample['timestamp']}s: RSS={memory['rss_mb']}MB, VSZ={memory['vsz_mb']}MB")
+                    log("  %ss: RSS=%sMB, VSZ=%sMB", timestamp, memory["rss_mb"], memory["vsz_mb"])
 
-            time.sleep(sample_interval)
+            next_sample += sample_interval
+            time.sleep(max(0, next_sample - time.monotonic()))
 
         # Stop server
         server.terminate()
@@ -125,19 +218,28 @@ def monitor_memory(duration: int, threshold_mb: int, verbose: bool = False) -> d
         return results
 
     # Analyze results
-    if results["samples"]:
-        rss_values = [s["rss_mb"] for s in results["samples"]]
-
+    if rss_count:
         results["analysis"] = {
-            "initial_mb": rss_values[0],
-            "final_mb": rss_values[-1],
-            "min_mb": min(rss_values),
-            "max_mb": max(rss_values),
-            "avg_mb": round(sum(rss_values) / len(rss_values), 2),
-            "growth_mb": round(rss_values[-1] - rss_values[0], 2),
-            "sample_count": len(rss_values)
+            "initial_mb": rss_first,
+            "final_mb": rss_last,
+            "min_mb": rss_min,
+            "max_mb": rss_max,
+            "avg_mb": round(rss_sum / rss_count, 2),
+            "growth_mb": round(rss_last - rss_first, 2),
+            "sample_count": rss_count
         }
 
+        # On long runs a regression slope is a better leak signal than
+        # end-minus-start; only worth the array build past ~1k kept samples
+        samples = results["samples"]
+        if HAVE_NUMBA and len(samples) > 1024:
+            count = len(samples)
+            timestamps = np.fromiter((s["timestamp"] for s in samples),
+                                     dtype=np.float64, count=count)
+            rss = np.fromiter((s["rss_mb"] for s in samples),
+                              dtype=np.float64, count=count)
+            results["analysis"]["slope_mb_per_s"] = round(float(_rss_slope(timestamps, rss)), 4)
+
         # Check for issues
         if results["analysis"]["max_mb"] > threshold_mb:
             results["warnings"].append(f"Memory exceeded threshold ({results['analysis']['max_mb']}MB > {threshold_mb}MB)")
@@ -161,50 +263,61 @@ def main():
     parser = argparse.ArgumentParser(description="Monitor CrawlForge MCP Server memory usage")
     parser.add_argument("--duration", "-d", type=int, default=30, help="Monitoring duration in seconds")
     parser.add_argument("--threshold", "-t", type=int, default=512, help="Memory threshold in MB")
+    parser.add_argument("--interval", "-i", type=float, default=None,
+                        help="Seconds between samples (default: duration/20)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
     args = parser.parse_args()
 
-    print("=== CrawlForge Memory Monitor ===")
-    print(f"Duration: {args.duration}s")
-    print(f"Threshold: {args.threshold}MB")
-    print("")
+    if args.interval is not None and args.interval <= 0:
+        parser.error("--interval must be positive")
+
+    global _QUIET
+    _QUIET = args.json and not args.verbose
+
+    log("=== CrawlForge Memory Monitor ===")
+    log(f"Duration: {args.duration}s")
+    log(f"Threshold: {args.threshold}MB")
+    log("")
 
-    results = monitor_memory(args.duration, args.threshold, args.verbose)
+    # The sample list is only reported via --json, so skip storing it otherwise
+    results = monitor_memory(args.duration, args.threshold, args.verbose,
+                             keep_samples=args.json, interval=args.interval)
 
     if results["status"] == "error":
-        print(f"Error: {results.get('error', 'Unknown error')}")
+        print(f"Error: {results.get('error', 'Unknown error')}", file=sys.stderr)
         sys.exit(1)
 
-    print("")
-    print("=== Memory Analysis ===")
+    log("")
+    log("=== Memory Analysis ===")
     if "analysis" in results:
         analysis = results["analysis"]
-        print(f"  Initial: {analysis['initial_mb']}MB")
-        print(f"  Final: {analysis['final_mb']}MB")
-        print(f"  Min: {analysis['min_mb']}MB")
-        print(f"  Max: {analysis['max_mb']}MB")
-        print(f"  Average: {analysis['avg_mb']}MB")
-        print(f"  Growth: {analysis['growth_mb']}MB")
-        print(f"  Samples: {analysis['sample_count']}")
+        log(f"  Initial: {analysis['initial_mb']}MB")
+        log(f"  Final: {analysis['final_mb']}MB")
+        log(f"  Min: {analysis['min_mb']}MB")
+        log(f"  Max: {analysis['max_mb']}MB")
+        log(f"  Average: {analysis['avg_mb']}MB")
+        log(f"  Growth: {analysis['growth_mb']}MB")
+        log(f"  Samples: {analysis['sample_count']}")
 
     if results["warnings"]:
-        print("")
-        print("=== Warnings ===")
+        log("")
+        log("=== Warnings ===")
         for warning in results["warnings"]:
-            print(f"  - {warning}")
+            log(f"  - {warning}")
 
-    print("")
+    log("")
     if results["status"] == "pass":
-        print("Result: PASS - Memory usage within acceptable limits")
+        log("Result: PASS - Memory usage within acceptable limits")
     elif results["status"] == "warning":
-        print("Result: WARNING - Memory usage concerns detected")
+        log("Result: WARNING - Memory usage concerns detected")
     else:
-        print("Result: FAIL - Memory monitoring failed")
+        log("Result: FAIL - Memory monitoring failed")
 
     if args.json:
-        print("")
-        print(json.dumps(results, indent=2))
+        log("")
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
 
     sys.exit(0 if results["status"] == "pass" else 1)
 
@@ -8,7 +8,10 @@ Usage: python3 validate-agent.py <agent-name>
        python3 validate-agent.py --find <keyword>
 """
 
+import bisect
+import difflib
 import sys
+from collections import defaultdict
 from typing import Optional
 
 # Complete registry of available agents for CrawlForge MCP Server
@@ -44,18 +47,28 @@ AGENTS = {
 }
 
 
+# Inverted keyword -> agents index built once at import; a lookup is then a
+# dict hit plus a bisect prefix scan instead of substring tests per agent.
+# Agent names are indexed whole and per hyphen token so non-leading name
+# words ("monitor", "implementation") stay findable.
+_KEYWORD_INDEX: dict[str, set[str]] = defaultdict(set)
+for _name, _info in AGENTS.items():
+    _KEYWORD_INDEX[_name].add(_name)
+    for _token in _name.split("-"):
+        _KEYWORD_INDEX[_token].add(_name)
+    for _kw in _info["keywords"]:
+        _KEYWORD_INDEX[_kw].add(_name)
+_SORTED_KEYS = sorted(_KEYWORD_INDEX)
+
+
 def validate_agent(name: str) -> tuple[bool, Optional[str]]:
     """Validate if an agent name exists."""
     if name in AGENTS:
         return True, AGENTS[name]["description"]
 
-    # Check for common mistakes
-    suggestions = []
+    # Suggest close matches for typos (e.g. "mcp-implimentation")
     name_lower = name.lower().replace("_", "-")
-
-    for agent_name in AGENTS:
-        if name_lower in agent_name or agent_name in name_lower:
-            suggestions.append(agent_name)
+    suggestions = difflib.get_close_matches(name_lower, AGENTS.keys(), n=3, cutoff=0.6)
 
     if suggestions:
         return False, f"Did you mean: {', '.join(suggestions)}?"
@@ -64,17 +77,17 @@ def validate_agent(name: str) -> tuple[bool, Optional[str]]:
 
 
 def find_agent_by_keyword(keyword: str) -> list[str]:
-    """Find agents that match a keyword."""
+    """Find agents that match a keyword (exact or prefix)."""
     keyword_lower = keyword.lower()
-    matches = []
+    matches = set(_KEYWORD_INDEX.get(keyword_lower, ()))
 
-    for agent_name, info in AGENTS.items():
-        if keyword_lower in agent_name:
-            matches.append(agent_name)
-        elif any(keyword_lower in kw for kw in info["keywords"]):
-            matches.append(agent_name)
+    # Prefix matches: scan sorted keys from the bisect insertion point
+    i = bisect.bisect_left(_SORTED_KEYS, keyword_lower)
+    while i < len(_SORTED_KEYS) and _SORTED_KEYS[i].startswith(keyword_lower):
+        matches |= _KEYWORD_INDEX[_SORTED_KEYS[i]]
+        i += 1
 
-    return matches
+    return sorted(matches)
 
 
 def list_all_agents():
@@ -7,13 +7,26 @@ Usage: python3 check-ssrf.py [--test-url URL] [--verbose]
 """
 
 import argparse
+import functools
 import ipaddress
 import json
+import mmap
+import os
 import re
+import socket
 import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 
+# Optional: pytricia makes the private-range check a single radix-trie lookup
+# instead of a linear scan over ip_network objects
+try:
+    import pytricia
+except ImportError:
+    pytricia = None
+
 
 def get_project_root() -> Path:
     """Get the project root directory."""
@@ -21,19 +34,54 @@ def get_project_root() -> Path:
 
 
 # Private IP ranges that should be blocked
-PRIVATE_RANGES = [
-    ipaddress.ip_network("10.0.0.0/8"),
-    ipaddress.ip_network("172.16.0.0/12"),
-    ipaddress.ip_network("192.168.0.0/16"),
-    ipaddress.ip_network("127.0.0.0/8"),
-    ipaddress.ip_network("169.254.0.0/16"),  # Link-local
-    ipaddress.ip_network("::1/128"),  # IPv6 loopback
-    ipaddress.ip_network("fc00::/7"),  # IPv6 private
-    ipaddress.ip_network("fe80::/10"),  # IPv6 link-local
+_PRIVATE_CIDRS = [
+    "10.0.0.0/8",
+    "172.16.0.0/12",
+    "192.168.0.0/16",
+    "127.0.0.0/8",
+    "169.254.0.0/16",  # Link-local
+    "::1/128",  # IPv6 loopback
+    "fc00::/7",  # IPv6 private
+    "fe80::/10",  # IPv6 link-local
 ]
 
-# Dangerous hostnames
-BLOCKED_HOSTNAMES = [
+if pytricia is not None:
+    _TRIE4 = pytricia.PyTricia(32)
+    _TRIE6 = pytricia.PyTricia(128)
+    for _cidr in _PRIVATE_CIDRS:
+        (_TRIE6 if ":" in _cidr else _TRIE4).insert(_cidr, True)
+
+# Integer (network, mask) tables for the stdlib fallback: containment becomes
+# a plain (ip & mask) == net test. ipaddress is only used here, at import,
+# to expand the CIDRs — the per-address hot path never touches it.
+_NETWORKS = [ipaddress.ip_network(c) for c in _PRIVATE_CIDRS]
+_V4_TABLE = tuple((int(n.network_address), int(n.netmask))
+                  for n in _NETWORKS if n.version == 4)
+_V6_TABLE = tuple((int(n.network_address), int(n.netmask))
+                  for n in _NETWORKS if n.version == 6)
+
+# Optional: numba JITs the IPv4 containment loop (v6 stays in Python — its
+# 128-bit masks don't fit numba's integer types and there are only 3 ranges)
+try:
+    import numpy as np
+    from numba import njit
+
+    _V4_NETS = np.array([net for net, _ in _V4_TABLE], dtype=np.uint32)
+    _V4_MASKS = np.array([mask for _, mask in _V4_TABLE], dtype=np.uint32)
+
+    @njit("b1(u4, u4[:], u4[:])", cache=True)
+    def _v4_contains(ip, nets, masks):
+        for i in range(nets.shape[0]):
+            if ip & masks[i] == nets[i]:
+                return True
+        return False
+
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# Dangerous hostnames (lowercase; frozenset for O(1) hashed membership)
+BLOCKED_HOSTNAMES = frozenset((
     "localhost",
     "127.0.0.1",
     "0.0.0.0",
@@ -41,7 +89,7 @@ BLOCKED_HOSTNAMES = [
     "metadata.google.internal",  # Cloud metadata
     "169.254.169.254",  # AWS/GCP metadata
     "metadata.azure.com",  # Azure metadata
-]
+))
 
 # Test URLs to validate SSRF protection
 TEST_URLS = [
@@ -63,41 +111,89 @@ TEST_URLS = [
 ]
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_ip(hostname: str):
+    """Return (version, int) for an IP literal, or None.
+
+    socket.inet_pton is C-level and far cheaper than ipaddress.ip_address,
+    which allocates several Python objects per call.
+    """
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, hostname), "big")
+    except OSError:
+        try:
+            return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, hostname), "big")
+        except OSError:
+            return None
+
+
+def _maybe_ip(hostname: str) -> bool:
+    """Cheap pre-test: only digit-leading or colon-bearing hosts can be IP literals.
+
+    Lets DNS hostnames skip inet_pton entirely, avoiding the exception
+    construction it costs on every non-IP input.
+    """
+    return bool(hostname) and (hostname[0].isdigit() or ":" in hostname)
+
+
 def is_private_ip(ip_str: str) -> bool:
     """Check if an IP address is in a private range."""
-    try:
-        ip = ipaddress.ip_address(ip_str)
-        for network in PRIVATE_RANGES:
-            if ip in network:
-                return True
-        return False
-    except ValueError:
+    if pytricia is not None:
+        try:
+            return ip_str in (_TRIE6 if ":" in ip_str else _TRIE4)
+        except ValueError:
+            return False
+
+    parsed = _parse_ip(ip_str)
+    if parsed is None:
         return False
 
+    version, ip_int = parsed
+    if version == 4:
+        if HAVE_NUMBA:
+            return bool(_v4_contains(np.uint32(ip_int), _V4_NETS, _V4_MASKS))
+        return any(ip_int & mask == net for net, mask in _V4_TABLE)
+    return any(ip_int & mask == net for net, mask in _V6_TABLE)
+
 
+# Fast prelude for the common http(s)://host[:port]/path shape; anything
+# with userinfo or an unusual layout falls through to the full RFC-3986
+# parser. The alternation keeps bracketed IPv6 literals intact.
+_FAST_RE = re.compile(r"^https?://([^/:\[@?#]+|\[[^\]]+\])(?::\d+)?(?:[/?#]|$)")
+
+
+@functools.lru_cache(maxsize=4096)
 def check_url_ssrf(url: str) -> tuple[bool, str]:
     """
     Check if a URL would be blocked by SSRF protection.
-    Returns (should_block, reason).
+    Returns (should_block, reason). Cached: repeated URLs (test batches,
+    bulk triage) skip the parse and allocation work entirely.
     """
     try:
-        parsed = urlparse(url)
-        hostname = parsed.hostname or ""
+        match = _FAST_RE.match(url)
+        if match is not None:
+            # Fast path guarantees an http/https scheme; lowercase to match
+            # what urlparse's hostname property would have returned
+            hostname = match.group(1).lower()
+            if hostname[0] == "[":
+                hostname = hostname[1:-1]
+            scheme_ok = True
+        else:
+            parsed = urlparse(url)
+            hostname = parsed.hostname or ""
+            scheme_ok = parsed.scheme in ("http", "https")
 
-        # Check blocked hostnames
-        if hostname.lower() in BLOCKED_HOSTNAMES:
+        # Check blocked hostnames (lowercased above, RFC 3986 §3.2.2)
+        if hostname in BLOCKED_HOSTNAMES:
             return True, f"Blocked hostname: {hostname}"
 
-        # Check if hostname is an IP address
-        try:
-            ip = ipaddress.ip_address(hostname)
-            if is_private_ip(str(ip)):
-                return True, f"Private IP address: {ip}"
-        except ValueError:
-            pass  # Not an IP address, hostname is fine
+        # Check if hostname is an IP address in a private range; plain DNS
+        # names fail the cheap shape test and never reach the parser
+        if _maybe_ip(hostname) and is_private_ip(hostname):
+            return True, f"Private IP address: {hostname}"
 
         # Check for scheme
-        if parsed.scheme not in ("http", "https"):
+        if not scheme_ok:
             return True, f"Invalid scheme: {parsed.scheme}"
 
         return False, "URL appears safe"
@@ -106,38 +202,77 @@ def check_url_ssrf(url: str) -> tuple[bool, str]:
         return True, f"Parse error: {e}"
 
 
+# Status labels bound once and interned so the per-test ternaries hand out
+# the same pointer instead of re-evaluating string literals
+_BLOCK, _ALLOW = sys.intern("BLOCK"), sys.intern("ALLOW")
+_PASS, _FAIL = sys.intern("PASS"), sys.intern("FAIL")
+
+# Lightweight row: namedtuples cost one slot array instead of a dict per
+# test, and convert back via _asdict() only when JSON output is requested
+TestRow = namedtuple("TestRow", "url description expected actual reason passed")
+
+
 def run_ssrf_tests(verbose: bool = False) -> dict:
     """Run all SSRF protection tests."""
-    results = {
-        "status": "pending",
-        "total": len(TEST_URLS),
-        "passed": 0,
-        "failed": 0,
-        "tests": []
-    }
+    tests = []
+    passed_count = 0
 
     for url, should_block, description in TEST_URLS:
         is_blocked, reason = check_url_ssrf(url)
         passed = is_blocked == should_block
+        passed_count += passed
+
+        tests.append(TestRow(
+            url=url,
+            description=description,
+            expected=_BLOCK if should_block else _ALLOW,
+            actual=_BLOCK if is_blocked else _ALLOW,
+            reason=reason,
+            passed=passed,
+        ))
+
+    failed_count = len(tests) - passed_count
+    return {
+        "status": "pass" if failed_count == 0 else "fail",
+        "total": len(TEST_URLS),
+        "passed": passed_count,
+        "failed": failed_count,
+        "tests": tests,
+    }
 
-        test_result = {
-            "url": url,
-            "description": description,
-            "expected": "BLOCK" if should_block else "ALLOW",
-            "actual": "BLOCK" if is_blocked else "ALLOW",
-            "reason": reason,
-            "passed": passed
-        }
 
-        results["tests"].append(test_result)
+# All implementation needles in one alternation: each file is walked once by
+# the regex engine instead of once per substring check
+_IMPL_RE = re.compile(rb"(?i)(ssrf|privateip|isprivate|localhost|block)")
 
-        if passed:
-            results["passed"] += 1
-        else:
-            results["failed"] += 1
 
-    results["status"] = "pass" if results["failed"] == 0 else "fail"
-    return results
+def _scan_file(path: Path):
+    """Return the set of lowercased needles found in a JS file, or None if unreadable.
+
+    The file is mmap'd so the scan reads straight from the page cache without
+    copying or decoding the content.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return {m.group(1).lower() for m in _IMPL_RE.finditer(mm)}
+    except (FileNotFoundError, ValueError):
+        # ValueError: empty files cannot be mapped
+        return None
+
+
+def _iter_js_files(root: Path):
+    """Stream .js paths under root via os.scandir without building a full list."""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".js"):
+                        yield Path(entry.path)
+        except FileNotFoundError:
+            continue
 
 
 def check_ssrf_implementation() -> dict:
@@ -158,32 +293,42 @@ def check_ssrf_implementation() -> dict:
         "server.js",
     ]
 
+    # Needle sets are kept by path so a file named in check_files (e.g.
+    # src/*/ssrf.js, server.js) is never mmap'd and scanned a second time
+    # by the recursive pass below.
+    seen: dict[Path, set | None] = {}
+
     for file_pattern in check_files:
         file_path = project_root / file_pattern
-        if file_path.exists():
-            results["files_checked"].append(str(file_path))
-            with open(file_path) as f:
-                content = f.read()
-
-            if "ssrf" in content.lower() or "SSRF" in content:
-                results["has_ssrf_check"] = True
-
-            if "privateIP" in content or "isPrivate" in content or "private" in content.lower():
-                results["has_private_ip_check"] = True
-
-            if "localhost" in content and "block" in content.lower():
-                results["has_hostname_blocklist"] = True
-
-    # Also check src/ recursively
-    src_dir = project_root / "src"
-    if src_dir.exists():
-        for js_file in src_dir.rglob("*.js"):
-            with open(js_file) as f:
-                content = f.read()
-            if "ssrf" in content.lower() or "privateIP" in content:
-                results["has_ssrf_check"] = True
-                if str(js_file) not in results["files_checked"]:
-                    results["files_checked"].append(str(js_file))
+        found = seen[file_path] = _scan_file(file_path)
+        if found is None:
+            continue
+        results["files_checked"].append(str(file_path))
+
+        if b"ssrf" in found:
+            results["has_ssrf_check"] = True
+
+        if b"privateip" in found or b"isprivate" in found:
+            results["has_private_ip_check"] = True
+
+        if b"localhost" in found and b"block" in found:
+            results["has_hostname_blocklist"] = True
+
+    # Also check src/ recursively. The per-file scans share no state, so
+    # threads overlap the open()/page-fault I/O across files (the regex
+    # matching itself stays serialized under the GIL); results reduce in
+    # traversal order on the main thread.
+    js_files = list(_iter_js_files(project_root / "src"))
+    unscanned = [p for p in js_files if p not in seen]
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+        seen.update(zip(unscanned, pool.map(_scan_file, unscanned)))
+
+    for js_file in js_files:
+        found = seen[js_file]
+        if found and (b"ssrf" in found or b"privateip" in found):
+            results["has_ssrf_check"] = True
+            if str(js_file) not in results["files_checked"]:
+                results["files_checked"].append(str(js_file))
 
     return results
 
@@ -231,10 +376,10 @@ def main():
     if args.verbose or test_results["failed"] > 0:
         print("=== Test Details ===")
         for test in test_results["tests"]:
-            status = "PASS" if test["passed"] else "FAIL"
-            print(f"\n  [{status}] {test['description']}")
-            print(f"       URL: {test['url']}")
-            print(f"       Expected: {test['expected']}, Got: {test['actual']}")
+            status = _PASS if test.passed else _FAIL
+            print(f"\n  [{status}] {test.description}")
+            print(f"       URL: {test.url}")
+            print(f"       Expected: {test.expected}, Got: {test.actual}")
 
     print("")
     if test_results["status"] == "pass":
@@ -244,10 +389,13 @@ def main():
 
     if args.json:
         print("")
-        print(json.dumps({
+        # json.dump streams to stdout without materializing one big string
+        json.dump({
             "implementation": impl_results,
-            "tests": test_results
-        }, indent=2))
+            "tests": {**test_results,
+                      "tests": [t._asdict() for t in test_results["tests"]]}
+        }, sys.stdout, indent=2)
+        sys.stdout.write("\n")
 
     sys.exit(0 if test_results["status"] == "pass" else 1)
 
@@ -8,6 +8,7 @@ Usage: python3 mcp-compliance.py [--verbose] [--json]
 
 import argparse
 import json
+import mmap
 import re
 import sys
 from pathlib import Path
@@ -18,97 +19,91 @@ def get_project_root() -> Path:
     return Path(__file__).parent.parent.parent.parent.parent
 
 
-def check_sdk_usage(content: str) -> dict:
+# Every needle from every check in one alternation: the whole compliance scan
+# is a single walk of the content, flipping flags by match group. Counting
+# registrations rides the same pass via the full-registration alternative.
+# StdioServerTransport is tried before the bare Server alternative so it wins
+# at the same position (it still implies the Server flag below).
+_SCAN_RE = re.compile(
+    rb'(?P<sdk>@modelcontextprotocol/sdk)'
+    rb'|(?P<stdio>StdioServerTransport)'
+    rb'|(?P<srv>McpServer|Server)'
+    rb'|(?P<tool>registerTool\s*\(\s*["\']\w+["\'])'
+    rb'|(?P<reg>registerTool|server\.tool)'
+    rb'|(?P<desc>description:\s*["\'][^"\']+["\'])'
+    rb'|(?P<schema>z\.|inputSchema)'
+    rb'|(?P<content>"content")'
+    rb'|(?P<type>"type")'
+    rb'|(?P<text>"text")'
+    rb'|(?P<err>isError|catch)'
+    rb'|(?P<sigint>SIGINT)'
+    rb'|(?P<sigterm>SIGTERM)'
+    rb'|(?P<grace>gracefulShutdown|cleanup|destroy)'
+)
+
+
+def scan(content) -> dict:
+    """Single fused pass producing every compliance flag plus tool_count."""
+    flags = dict.fromkeys(
+        ("sdk", "stdio", "srv", "reg", "desc", "schema", "content", "type",
+         "text", "err", "sigint", "sigterm", "grace"),
+        False,
+    )
+    tool_count = 0
+
+    for match in _SCAN_RE.finditer(content):
+        group = match.lastgroup
+        if group == "tool":
+            tool_count += 1
+            flags["reg"] = True
+        else:
+            flags[group] = True
+
+    if flags["stdio"]:
+        flags["srv"] = True
+
+    flags["tool_count"] = tool_count
+    return flags
+
+
+def check_sdk_usage(flags: dict) -> dict:
     """Check for proper MCP SDK usage."""
-    checks = {
-        "imports_sdk": False,
-        "uses_server_class": False,
-        "uses_stdio_transport": False,
+    return {
+        "imports_sdk": flags["sdk"],
+        "uses_server_class": flags["srv"],
+        "uses_stdio_transport": flags["stdio"],
     }
 
-    if "@modelcontextprotocol/sdk" in content:
-        checks["imports_sdk"] = True
 
-    if "McpServer" in content or "Server" in content:
-        checks["uses_server_class"] = True
-
-    if "StdioServerTransport" in content:
-        checks["uses_stdio_transport"] = True
-
-    return checks
-
-
-def check_tool_registration(content: str) -> dict:
+def check_tool_registration(flags: dict) -> dict:
     """Check tool registration patterns."""
-    checks = {
-        "uses_register_tool": False,
-        "has_descriptions": False,
-        "has_input_schemas": False,
-        "tool_count": 0,
+    return {
+        "uses_register_tool": flags["reg"],
+        "has_descriptions": flags["desc"],
+        "has_input_schemas": flags["schema"],
+        "tool_count": flags["tool_count"],
     }
 
-    if "registerTool" in content or "server.tool" in content:
-        checks["uses_register_tool"] = True
-
-    # Count tool registrations
-    tool_pattern = r'registerTool\s*\(\s*["\'](\w+)["\']'
-    tools = re.findall(tool_pattern, content)
-    checks["tool_count"] = len(tools)
-
-    # Check for descriptions
-    desc_pattern = r'description:\s*["\'][^"\']+["\']'
-    if re.search(desc_pattern, content):
-        checks["has_descriptions"] = True
-
-    # Check for input schemas (Zod)
-    if "z." in content or "inputSchema" in content:
-        checks["has_input_schemas"] = True
-
-    return checks
-
 
-def check_response_format(content: str) -> dict:
+def check_response_format(flags: dict) -> dict:
     """Check response format compliance."""
-    checks = {
-        "uses_content_array": False,
-        "uses_text_type": False,
-        "has_error_handling": False,
+    return {
+        # Content array format needs both markers
+        "uses_content_array": flags["content"] and flags["type"],
+        "uses_text_type": flags["text"],
+        "has_error_handling": flags["err"],
     }
 
-    # Check for content array format
-    if '"content"' in content and '"type"' in content:
-        checks["uses_content_array"] = True
 
-    if '"text"' in content:
-        checks["uses_text_type"] = True
-
-    if "isError" in content or "catch" in content:
-        checks["has_error_handling"] = True
-
-    return checks
-
-
-def check_lifecycle(content: str) -> dict:
+def check_lifecycle(flags: dict) -> dict:
     """Check server lifecycle management."""
-    checks = {
-        "has_graceful_shutdown": False,
-        "handles_sigint": False,
-        "handles_sigterm": False,
-        "cleans_up_resources": False,
+    return {
+        "has_graceful_shutdown": flags["grace"],
+        "handles_sigint": flags["sigint"],
+        "handles_sigterm": flags["sigterm"],
+        "cleans_up_resources": flags["grace"],
     }
 
-    if "SIGINT" in content:
-        checks["handles_sigint"] = True
-
-    if "SIGTERM" in content:
-        checks["handles_sigterm"] = True
-
-    if "gracefulShutdown" in content or "cleanup" in content or "destroy" in content:
-        checks["has_graceful_shutdown"] = True
-        checks["cleans_up_resources"] = True
-
-    return checks
-
 
 def run_compliance_check(verbose: bool = False) -> dict:
     """Run full MCP compliance check."""
@@ -124,19 +119,23 @@ def run_compliance_check(verbose: bool = False) -> dict:
         "recommendations": []
     }
 
-    if not server_path.exists():
+    # mmap the file: the byte patterns scan the page cache directly, with no
+    # full read or UTF-8 decode of the content
+    try:
+        f = open(server_path, 'rb')
+    except FileNotFoundError:
         results["status"] = "error"
         results["issues"].append("server.js not found")
         return results
 
-    with open(server_path, 'r') as f:
-        content = f.read()
+    with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+        # One fused pass over the content; the check functions are views
+        flags = scan(content)
 
-    # Run all checks
-    sdk_checks = check_sdk_usage(content)
-    tool_checks = check_tool_registration(content)
-    response_checks = check_response_format(content)
-    lifecycle_checks = check_lifecycle(content)
+    sdk_checks = check_sdk_usage(flags)
+    tool_checks = check_tool_registration(flags)
+    response_checks = check_response_format(flags)
+    lifecycle_checks = check_lifecycle(flags)
 
     results["checks"] = {
         "sdk_usage": sdk_checks,
@@ -231,7 +230,9 @@ def main():
     if args.json:
         print("")
         print("=== JSON Output ===")
-        print(json.dumps(results, indent=2))
+        # json.dump streams to stdout without materializing one big string
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
 
     sys.exit(0 if results["status"] == "pass" else 1)
 